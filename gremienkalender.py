@@ -8,29 +8,76 @@ write them to one iCalendar file per committee.
 """
 
 import argparse
+import concurrent.futures
 import http.client
+import json
 import logging
 import os
+import re
 import ssl
+import threading
 import time
-import zlib
+import urllib.parse
+import weakref
 
+try:
+    # ISA-L offers SIMD-accelerated DEFLATE with the same API surface.
+    from isal import isal_zlib as zlib
+except ImportError:
+    import zlib
+
+import lxml.etree
 import lxml.html
 
-parser = argparse.ArgumentParser()
-parser.add_argument(
-    '--log', type=str, choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'], default='ERROR')
-args = parser.parse_args()
-level = getattr(logging, args.log.upper(), None)
-logging.basicConfig(format='%(asctime)s %(levelname)s %(message)s',
-                    datefmt='%Y-%m-%d %H:%M:%S', level=level)
+def parse_arguments():
+    """Parse and return the command line arguments."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--log', type=str, choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'], default='ERROR')
+    return parser.parse_args()
+
 
 HOST = 'www.berlin.de'
-SESSION = http.client.HTTPSConnection(
-    HOST, context=ssl.create_default_context(), timeout=10)
+# XPath expressions are compiled once at import time; compiling them on
+# every page would redo the expression parsing per request.
+XPATH_ALLRISCONTAINER = lxml.etree.XPath('//div[@id="allriscontainer"]')
+XPATH_COMMITTEE_HEADER = lxml.etree.XPath(
+    'string(.//th[@colspan="6"])', smart_strings=False)
+XPATH_CALENDAR_VALUES = lxml.etree.XPath(
+    './/select[@id="GRA"]/option'
+    '[not(@class="calWeek") and not(contains(., "inaktiv"))]/@value',
+    smart_strings=False)
+XPATH_TABLEROWS_ZL1N = lxml.etree.XPath(
+    './/table[@class="tl1"]//tr[@class="zl11" or @class="zl12"]')
+XPATH_EVENT_DATE = lxml.etree.XPath('string(td[1])', smart_strings=False)
+XPATH_EVENT_TIME = lxml.etree.XPath('string(td[2])', smart_strings=False)
+XPATH_EVENT_TEXT = lxml.etree.XPath('string(td[4])', smart_strings=False)
+XPATH_EVENT_HREF = lxml.etree.XPath(
+    'string(td[4]/a/@href)', smart_strings=False)
+THREADS = threading.local()
+MAX_WORKERS = 8
+READ_BUFFER_SIZE = 128 * 1024
 REQUEST_DELAY = 10
 REQUEST_HEADERS = {'Connection': 'keep-alive', 'Accept-Encoding': 'gzip'}
-DTSTAMP = '{}{:02d}{:02d}T{:02d}{:02d}{:02d}Z'.format(*time.gmtime())
+CACHE_FILENAME = os.path.join('calendars', '.http-cache.json')
+CACHE_LOCK = threading.Lock()
+HTTP_CACHE = {}
+CONNECTIONS = weakref.WeakSet()
+_NOW = time.time()
+DTSTAMP = '{}{:02d}{:02d}T{:02d}{:02d}{:02d}Z'.format(*time.gmtime(_NOW))
+STAND = "{2:02d}.{1:02d}.{0}, {3:02d}:{4:02d} Uhr".format(
+    *time.localtime(_NOW))
+# events can only survive the one-day staleness gate with one of these
+# years, so rows from other years are dropped without calling mktime
+ACCEPTABLE_YEARS = frozenset(
+    str(year) for year in range(time.localtime(_NOW).tm_year - 1,
+                                time.localtime(_NOW).tm_year + 2))
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             'templates')
+with open(os.path.join(TEMPLATES_DIR, 'vevent.ics'), 'r') as _icsfile:
+    VEVENT_TEMPLATE = _icsfile.read()
+with open(os.path.join(TEMPLATES_DIR, 'vcalendar.ics'), 'r') as _icsfile:
+    VCALENDAR_TEMPLATE = _icsfile.read()
 BOROUGH_NAMES = {
     'ba-charlottenburg-wilmersdorf': 'Charlottenburg-Wilmersdorf',
     'ba-friedrichshain-kreuzberg': 'Friedrichshain-Kreuzberg',
@@ -45,6 +92,76 @@ BOROUGH_NAMES = {
     'ba-tempelhof-schoeneberg': 'Tempelhof-Schöneberg',
     'ba-treptow-koepenick': 'Treptow-Köpenick'
 }
+BOROUGH_SLUG_PATTERN = re.compile('|'.join(
+    re.escape(slug)
+    for slug in sorted(BOROUGH_NAMES, key=len, reverse=True)))
+EVENT_DATE_PATTERN = re.compile(r'(\d{2})\.(\d{2})\.(\d{4})')
+EVENT_TIME_PATTERN = re.compile(r'(\d{2}):(\d{2})')
+
+
+def get_connection():
+    """Return the keep-alive connection of the current thread.
+
+    Each worker thread keeps its own connection so the committee pages
+    can be fetched concurrently while every single connection still
+    waits REQUEST_DELAY seconds between its requests.
+    """
+    connection = getattr(THREADS, 'connection', None)
+    if connection is None:
+        connection = http.client.HTTPSConnection(
+            HOST, context=ssl.create_default_context(), timeout=10,
+            blocksize=READ_BUFFER_SIZE)
+        THREADS.connection = connection
+        THREADS.headers = dict(REQUEST_HEADERS)
+        CONNECTIONS.add(connection)
+    return connection
+
+
+def get_html_parser():
+    """Return the reused HTML parser of the current thread.
+
+    Parser objects are cheap to reuse but not thread-safe, so each
+    worker keeps its own instead of constructing one per page.
+    """
+    html_parser = getattr(THREADS, 'html_parser', None)
+    if html_parser is None:
+        html_parser = lxml.html.HTMLParser(
+            encoding='iso-8859-1', remove_blank_text=True,
+            remove_comments=True, collect_ids=False)
+        THREADS.html_parser = html_parser
+    return html_parser
+
+
+def load_http_cache():
+    """Return the cached response validators of earlier runs."""
+    try:
+        with open(CACHE_FILENAME, 'r') as jsonfile:
+            return json.load(jsonfile)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_http_cache():
+    """Write the response validators next to the calendar files."""
+    os.makedirs(os.path.dirname(CACHE_FILENAME), exist_ok=True)
+    with open(CACHE_FILENAME, 'w') as jsonfile:
+        json.dump(HTTP_CACHE, jsonfile, indent=2, sort_keys=True)
+
+
+def throttle_request():
+    """Sleep just long enough to space out requests of this thread.
+
+    The politeness budget counts from the start of the previous request
+    on the same connection, so time spent waiting for the server,
+    inflating and parsing is subtracted from the delay instead of being
+    added on top of an unconditional sleep.
+    """
+    now = time.monotonic()
+    next_request = getattr(THREADS, 'next_request', 0.0)
+    if next_request > now:
+        time.sleep(next_request - now)
+        now = time.monotonic()
+    THREADS.next_request = now + REQUEST_DELAY
 
 
 def save_cookie(response):
@@ -52,75 +169,99 @@ def save_cookie(response):
     session_cookie = response.getheader('Set-Cookie')
     if session_cookie:
         session_cookie = session_cookie.split(';', 1)[0]
-        REQUEST_HEADERS['Cookie'] = session_cookie
-
-
-def decode_response(response_body):
-    """Decode response body and return a unicode string."""
-    try:
-        response_body = response_body.decode('iso-8859-1', 'strict')
-    except UnicodeDecodeError:
-        print('decoding iso-8859-1 failed')
-        try:
-            response_body = response_body.decode('iso-8859-15', 'strict')
-        except UnicodeDecodeError:
-            print('decoding iso-8859-15 failed, too')
-            response_body = response_body.decode('windows-1252', 'replace')
-    return response_body
+        THREADS.headers['Cookie'] = session_cookie
 
 
 def find_allriscontainer(response_body, base_url):
-    """Find allriscontainer div element in html page source string."""
-    response_body = response_body.split('s-->', 1)[1]
-    response_body = response_body.split('<!-- H', 1)[0]
-    html = lxml.html.fromstring(response_body, base_url=base_url)
-    for div in html.getiterator('div'):
-        if div.get('id') and div.get('id') == 'allriscontainer':
-            return div
-
-
-def get_allriscontainer(url):
-    """Return the *url*s' response body as an lxml.html.HtmlElement."""
+    """Find allriscontainer div element in html page source bytes."""
+    start = response_body.find(b's-->')
+    if start == -1:
+        raise ValueError('allriscontainer marker not found')
+    start += 4
+    end = response_body.find(b'<!-- H', start)
+    if end == -1:
+        end = len(response_body)
+    html = lxml.html.fromstring(
+        response_body[start:end], base_url=base_url,
+        parser=get_html_parser())
+    # the sliced fragment normally is the container itself
+    if html.get('id') == 'allriscontainer':
+        return html
+    divs = XPATH_ALLRISCONTAINER(html)
+    if divs:
+        return divs[0]
+
+
+def get_allriscontainer(url, use_cache=False):
+    """Return the *url*s' response body as an lxml.html.HtmlElement.
+
+    With *use_cache* the request carries the validators remembered from
+    the previous run and None is returned when the server answers with
+    304 Not Modified, meaning the page is unchanged.
+    """
     logging.info("url: {}".format(url))
     request_path = url.split(HOST, 1)[1]
     logging.debug("path: {}".format(request_path))
-    time.sleep(REQUEST_DELAY)
-    SESSION.request('GET', request_path, headers=REQUEST_HEADERS)
+    connection = get_connection()
+    headers = THREADS.headers
+    if use_cache:
+        with CACHE_LOCK:
+            validators = HTTP_CACHE.get(url)
+        if validators:
+            headers = dict(headers)
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+    throttle_request()
     try:
-        response = SESSION.getresponse()
-    except (http.client.BadStatusLine, http.client.socket.timeout):
+        connection.request('GET', request_path, headers=headers)
+        response = connection.getresponse()
+    except (http.client.HTTPException, OSError):
         logging.warning('starting a new session')
-        SESSION.close()
-        if 'Cookie' in REQUEST_HEADERS:
-            del REQUEST_HEADERS['Cookie']
-        time.sleep(REQUEST_DELAY)
-        SESSION.request('GET', request_path, headers=REQUEST_HEADERS)
-        response = SESSION.getresponse()
+        connection.close()
+        if 'Cookie' in THREADS.headers:
+            del THREADS.headers['Cookie']
+        throttle_request()
+        connection.request('GET', request_path, headers=headers)
+        response = connection.getresponse()
+    if response.status == 304:
+        response.read()
+        logging.info("not modified: {}".format(url))
+        return None
     if response.status != 200:
         message = "{} {}".format(response.status, url)
         logging.error(message)
         raise Exception(message)
     save_cookie(response)
-    response_body = response.read()
-    response_body = zlib.decompress(response_body, 47)
-    response_body = decode_response(response_body)
-    return find_allriscontainer(response_body, url)
+    etag = response.getheader('ETag')
+    last_modified = response.getheader('Last-Modified')
+    if etag or last_modified:
+        with CACHE_LOCK:
+            HTTP_CACHE[url] = {
+                'etag': etag, 'last_modified': last_modified}
+    read_buffer = getattr(THREADS, 'read_buffer', None)
+    if read_buffer is None:
+        read_buffer = bytearray(READ_BUFFER_SIZE)
+        THREADS.read_buffer = read_buffer
+    buffer_view = memoryview(read_buffer)
+    decompressor = zlib.decompressobj(47)
+    response_body = bytearray()
+    while True:
+        count = response.readinto(read_buffer)
+        if not count:
+            break
+        response_body += decompressor.decompress(buffer_view[:count])
+    response_body += decompressor.flush()
+    return find_allriscontainer(bytes(response_body), url)
 
 
 def findall_calendars(allriscontainer):
     """Return a list of calendar links extracted from html content."""
-    for select in allriscontainer.getiterator('select'):
-        if select.get('id') and select.get('id') == 'GRA':
-            values = set()
-            for option in select.getiterator('option'):
-                if not option.get('class') == 'calWeek':
-                    if not 'inaktiv' in option.text:
-                        value = option.get('value')
-                        value = int(value)
-                        values.add(value)
-            base = allriscontainer.base_url
-            values = sorted(values)
-            return ['{}?GRA={}'.format(base, value) for value in values]
+    values = [int(value) for value in XPATH_CALENDAR_VALUES(allriscontainer)]
+    base = allriscontainer.base_url
+    values = dict.fromkeys(values)
+    return ['{}?GRA={}'.format(base, value) for value in values]
 
 
 def date_range(months=3):
@@ -139,7 +280,7 @@ DATE_RANGE = date_range()
 
 
 def find_borough_slug(url):
-    slug = url.split('/', 4)[3]
+    slug = BOROUGH_SLUG_PATTERN.search(url).group(0)
     slug = slug[3:]
     return slug
 
@@ -162,124 +303,112 @@ def find_calendar_url(url):
 def find_calendar_uid(url):
     borough = find_borough_slug(url)
     committee = find_committee_id(url)
-    calendar_uid = borough + '-' + '%03d' % committee
-    calendar_uid = '%s-%03d' % (borough, committee)
-    calendar_uid = '{}-{:03d}'.format(borough, committee)
-    return calendar_uid
+    return '{}-{:03d}'.format(borough, committee)
 
 
 def find_calendar_borough(url):
-    calendar_borough = url
-    calendar_borough = calendar_borough.split('/', 4)[3]
+    calendar_borough = BOROUGH_SLUG_PATTERN.search(url).group(0)
     calendar_borough = BOROUGH_NAMES[calendar_borough]
     return calendar_borough
 
 
 def find_calendar_committee(allriscontainer):
-    cells = allriscontainer.getiterator('th')
-    for cell in cells:
-        if cell.get('colspan') == '6':
-            committee = cell.text_content()
-            committee = committee[23:].split(' im Zeitraum', 1)[0]
-            return committee
+    header = XPATH_COMMITTEE_HEADER(allriscontainer)
+    if header:
+        committee = header.partition('Sitzungen des Gremiums ')[2]
+        committee = committee.partition(' im Zeitraum')[0]
+        return committee
 
 
 def findall_tablerows_zl1n(allriscontainer):
-    for table in allriscontainer.getiterator('table'):
-        if table.get('class') == 'tl1':
-            tablerows = []
-            for row in table.getiterator('tr'):
-                if row.get('class') == 'zl11' or row.get('class') == 'zl12':
-                    tablerows.append(row)
-            return tablerows
+    return XPATH_TABLEROWS_ZL1N(allriscontainer)
 
 
 def find_event_dtstart(row):
-    date_text = row[0].text[4:]
-    time_text = row[1].text[:5]
-    if date_text.strip() and time_text.strip():
-        dtstart = (
-            int(date_text[6:10]),
-            int(date_text[3:5]),
-            int(date_text[0:2]),
-            int(time_text[0:2]),
-            int(time_text[3:5]),
+    date_match = EVENT_DATE_PATTERN.search(XPATH_EVENT_DATE(row))
+    time_match = EVENT_TIME_PATTERN.search(XPATH_EVENT_TIME(row))
+    if date_match and time_match:
+        day, month, year = date_match.groups()
+        if year not in ACCEPTABLE_YEARS:
+            return None
+        hour, minute = time_match.groups()
+        timetuple = (
+            int(year),
+            int(month),
+            int(day),
+            int(hour),
+            int(minute),
             0,
             0,
             0,
             0
         )
-        elapsed_time = (time.time() - time.mktime(dtstart))
+        elapsed_time = (time.time() - time.mktime(timetuple))
         one_day = 60*60*24
         if elapsed_time < 1*one_day:
-            dtstart = '{}{:02d}{:02d}T{:02d}{:02d}{:02d}'.format(*dtstart)
-            return dtstart
+            return '{}{}{}T{}{}00'.format(year, month, day, hour, minute)
 
 
 def find_event_description(row):
-    try:
-        return row[3][0].text
-    except IndexError:
-        return row[3].text
+    return XPATH_EVENT_TEXT(row).strip()
 
 
-def find_event_url(row):
-    try:
-        href = row[3][0].get('href')
-        return 'https://{}{}'.format(HOST, href)
-    except IndexError:
-        return ''
+def find_event_url(row, base_url):
+    href = XPATH_EVENT_HREF(row)
+    if href:
+        return urllib.parse.urljoin(base_url, href)
+    return ''
 
 
-def findall_events(allriscontainer):
+def findall_events(allriscontainer, calendar_uid, summary):
     events = []
     base_url = allriscontainer.base_url
-    calendar_uid = find_calendar_uid(base_url)
-    committee_name = find_calendar_committee(allriscontainer)
     rows = findall_tablerows_zl1n(allriscontainer)
     for row in rows:
-        event = {
+        dtstart = find_event_dtstart(row)
+        if not dtstart:
+            continue
+        url = find_event_url(row, base_url)
+        events.append({
             'dtstamp': DTSTAMP,
-            'dtstart': find_event_dtstart(row),
-            'summary': find_calendar_borough(base_url) + ': ' + committee_name,
-            'location': ''
-        }
-        if event.get('dtstart'):
-            event['url'] = find_event_url(row)
-            event['description'] = '{}\\n{}\\n-- \\nQuelle: {}\\nStand: {}'.format(
-                find_event_description(row),
-                event['url'],
-                base_url,
-                "{2:02d}.{1:02d}.{0}, {3:02d}:{4:02d} Uhr".format(
-                    *time.localtime()
-                )
-            )
-            event['uid'] = '{}-{}'.format(calendar_uid, event['dtstart'])
-            events.append(event)
+            'dtstart': dtstart,
+            'summary': summary,
+            'location': '',
+            'url': url,
+            'description': '{}\\n{}\\n-- \\nQuelle: {}\\nStand: {}'.format(
+                find_event_description(row), url, base_url, STAND),
+            'uid': '{}-{}'.format(calendar_uid, dtstart)
+        })
     return events
 
 
 def extract_vcalendar(allriscontainer):
     """Return a list of committee meetings extracted from html content."""
+    base_url = allriscontainer.base_url
+    calendar_uid = find_calendar_uid(base_url)
+    borough = find_calendar_borough(base_url)
+    committee_name = find_calendar_committee(allriscontainer)
+    name = '{}: {}'.format(borough, committee_name)
     vcalendar = {
-        'vevents': findall_events(allriscontainer),
+        'vevents': findall_events(allriscontainer, calendar_uid, name),
     }
     if vcalendar.get('vevents'):
-        base_url = allriscontainer.base_url
         vcalendar['url'] = find_calendar_url(base_url)
-        vcalendar['uid'] = find_calendar_uid(base_url)
-        vcalendar['borough'] = find_calendar_borough(base_url)
-        vcalendar['committee'] = find_calendar_committee(allriscontainer)
-        vcalendar['name'] = '{}: {}'.format(
-            vcalendar['borough'],
-            vcalendar['committee']
-        )
+        vcalendar['uid'] = calendar_uid
+        vcalendar['borough'] = borough
+        vcalendar['committee'] = committee_name
+        vcalendar['name'] = name
         return vcalendar
 
 
 def fold_content_lines(content):
     """Fold lines of *content* string to a length of 75 octets.
 
+    Encodes the content to UTF-8 once and picks the cut points on the
+    byte level, backing up over continuation bytes (0b10xxxxxx) so no
+    multi-byte character is ever split. Yields the folded lines as
+    bytes, one by one, so the caller can stream them to a file.
+
     "Lines of text SHOULD NOT be longer than 75 octets, excluding the line
     break.  Long content lines SHOULD be split into a multiple line
     representations using a line "folding" technique.  That is, a long
@@ -287,43 +416,96 @@ def fold_content_lines(content):
     immediately followed by a single linear white-space character"
     https://tools.ietf.org/html/rfc5545#section-3.1
     """
-    content_lines = content.splitlines()
-    folded_content_lines = []
     max_octets = 75
-    for line in content_lines:
-        while line:
-            characters = max_octets
-            encoded_line = line[:characters].encode('utf-8')
-            while len(encoded_line) > max_octets:
-                characters -= 1
-                encoded_line = line[:characters].encode('utf-8')
-            folded_content_lines.append(line[:characters])
-            line = line[characters:]
-            if line:
-                line = ' '+line
-    folded_content = '\n'.join(folded_content_lines)
-    return folded_content+'\n'
+    for line in content.encode('utf-8').splitlines():
+        length = len(line)
+        if not length:
+            continue
+        if length <= max_octets:
+            yield line
+            continue
+        end = max_octets
+        while line[end] & 0xC0 == 0x80:
+            end -= 1
+        yield line[:end]
+        start = end
+        while start < length:
+            # the leading fold space counts towards the 75 octets
+            end = start + max_octets - 1
+            if end < length:
+                while line[end] & 0xC0 == 0x80:
+                    end -= 1
+            else:
+                end = length
+            yield b' ' + line[start:end]
+            start = end
 
 
 def write_vcalendar_file(vcalendar):
     """Create iCalendar data format strings and write them to files."""
     if vcalendar.get('vevents'):
-        with open(os.path.join('templates', 'vevent.ics'), 'r') as icsfile:
-            vevent_template = icsfile.read()
-        with open(os.path.join('templates', 'vcalendar.ics'), 'r') as icsfile:
-            vcalendar_template = icsfile.read()
-        vevents_string = ''
-        for vevent in vcalendar['vevents']:
-            vevent_string = vevent_template.format(**vevent)
-            vevents_string += vevent_string
+        vevents_string = ''.join(
+            VEVENT_TEMPLATE.format_map(vevent)
+            for vevent in vcalendar['vevents'])
         vcalendar['vevents'] = vevents_string+'\n'
-        vcalendar_string = vcalendar_template.format(**vcalendar)
-        vcalendar_string = fold_content_lines(vcalendar_string)
+        vcalendar_string = VCALENDAR_TEMPLATE.format_map(vcalendar)
+        ics_bytes = b''.join(
+            line + b'\r\n' for line in fold_content_lines(vcalendar_string))
         filename = '{}.ics'.format(vcalendar['uid'])
         filename = os.path.join('calendars', filename)
         os.makedirs(os.path.dirname(filename), exist_ok=True)
-        with open(filename, 'w', newline='\r\n') as icsfile:
-            icsfile.write(vcalendar_string)
+        try:
+            with open(filename, 'rb') as icsfile:
+                if icsfile.read() == ics_bytes:
+                    return
+        except OSError:
+            pass
+        with open(filename + '.tmp', 'wb') as icsfile:
+            icsfile.write(ics_bytes)
+        os.replace(filename + '.tmp', filename)
+
+
+def crawl_borough(link):
+    """Crawl one council and write the calendars of all its committees.
+
+    Runs completely inside one worker thread so a borough's requests
+    share the same keep-alive connection and ALLRIS session cookie.
+    The committee links extracted from the index page are stored in the
+    http cache so an unchanged page (304) does not need re-parsing.
+    """
+    with CACHE_LOCK:
+        cached = HTTP_CACHE.get(link)
+        cached_links = cached.get('committee_links') if cached else None
+    try:
+        allriscontainer = get_allriscontainer(
+            link, use_cache=bool(cached_links))
+    except:
+        logging.warning('Skipping {}'.format(link))
+        return
+    if allriscontainer is None:
+        committee_links = cached_links
+    else:
+        committee_links = findall_calendars(allriscontainer)
+        with CACHE_LOCK:
+            if link in HTTP_CACHE:
+                HTTP_CACHE[link]['committee_links'] = committee_links
+    for committee_link in committee_links:
+        crawl_committee(committee_link)
+
+
+def crawl_committee(link):
+    """Fetch one committee calendar and write its iCalendar file."""
+    link += '&' + DATE_RANGE
+    try:
+        allriscontainer = get_allriscontainer(link, use_cache=True)
+    except:
+        logging.warning('Skipping {}'.format(link))
+        return
+    if allriscontainer is None:
+        return
+    vcalendar = extract_vcalendar(allriscontainer)
+    if vcalendar:
+        write_vcalendar_file(vcalendar)
 
 
 def main():
@@ -335,25 +517,19 @@ def main():
                        'https://www.berlin.de/ba'}
         council_links = [l for l in council_links if l[:24] in valid_links]
 
-    for link in council_links:
-        try:
-            allriscontainer = get_allriscontainer(link)
-        except:
-            logging.warning('Skipping {}'.format(link))
-            continue
-        committee_links = findall_calendars(allriscontainer)
-        for link in committee_links:
-            link += '&' + DATE_RANGE
-            try:
-                allriscontainer = get_allriscontainer(link)
-            except:
-                logging.warning('Skipping {}'.format(link))
-                continue
-            vcalendar = extract_vcalendar(allriscontainer)
-            if vcalendar:
-                write_vcalendar_file(vcalendar)
-    SESSION.close()
+    HTTP_CACHE.update(load_http_cache())
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=MAX_WORKERS) as executor:
+        for _ in executor.map(crawl_borough, council_links):
+            pass
+    for connection in CONNECTIONS:
+        connection.close()
+    save_http_cache()
 
 
 if __name__ == '__main__':
+    args = parse_arguments()
+    logging.basicConfig(format='%(asctime)s %(levelname)s %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S',
+                        level=getattr(logging, args.log.upper(), None))
     main()
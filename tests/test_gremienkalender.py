@@ -1,3 +1,4 @@
+import time
 import unittest
 
 import lxml
@@ -18,6 +19,64 @@ class TestGremienkalender(unittest.TestCase):
             self.fail("Should not raise exceptions: {0}".format(
                 type(exception)))
 
+    def test_find_event_url(self):
+        base_url = 'https://www.berlin.de/ba-mitte/online/si018.asp?GRA=5'
+        row = lxml.html.fromstring(
+            '<tr><td/><td/><td/>'
+            '<td><a href="to010.asp?SILFDNR=1">Sitzung</a></td></tr>')
+        self.assertEqual(
+            gremienkalender.find_event_url(row, base_url),
+            'https://www.berlin.de/ba-mitte/online/to010.asp?SILFDNR=1')
+        row = lxml.html.fromstring('<tr><td/><td/><td/><td>kein Link</td></tr>')
+        self.assertEqual(gremienkalender.find_event_url(row, base_url), '')
+
+    def test_throttle_request(self):
+        request_delay = gremienkalender.REQUEST_DELAY
+        gremienkalender.REQUEST_DELAY = 0.1
+        try:
+            gremienkalender.THREADS.next_request = 0.0
+            start = time.monotonic()
+            gremienkalender.throttle_request()
+            first = time.monotonic() - start
+            gremienkalender.throttle_request()
+            total = time.monotonic() - start
+            self.assertLess(first, 0.05)
+            self.assertGreaterEqual(total, 0.1)
+        finally:
+            gremienkalender.REQUEST_DELAY = request_delay
+            gremienkalender.THREADS.next_request = 0.0
+
+    def test_extract_vcalendar(self):
+        base_url = 'https://www.berlin.de/ba-mitte/online/si018.asp?GRA=5'
+        tomorrow = time.localtime(time.time() + 24*60*60)
+        date = time.strftime('Mo, %d.%m.%Y', tomorrow)
+        allriscontainer = lxml.html.fromstring(
+            '<div id="allriscontainer"><table class="tl1">'
+            '<tr><th colspan="6">Sitzungen des Gremiums Hauptausschuss'
+            ' im Zeitraum</th></tr>'
+            '<tr class="zl11"><td>{}</td><td>17:30 Uhr</td><td/>'
+            '<td><a href="to010.asp?SILFDNR=1">Sitzung</a></td></tr>'
+            '<tr class="zl12"><td>Mo, 01.02.2019</td><td>10:00 Uhr</td>'
+            '<td/><td>vergangene Sitzung</td></tr>'
+            '</table></div>'.format(date),
+            base_url=base_url)
+        vcalendar = gremienkalender.extract_vcalendar(allriscontainer)
+        self.assertEqual(vcalendar['uid'], 'mitte-005')
+        self.assertEqual(vcalendar['name'], 'Mitte: Hauptausschuss')
+        self.assertEqual(len(vcalendar['vevents']), 1)
+        vevent = vcalendar['vevents'][0]
+        self.assertEqual(vevent['summary'], 'Mitte: Hauptausschuss')
+        self.assertTrue(vevent['uid'].startswith('mitte-005-'))
+        self.assertIn('Sitzung', vevent['description'])
+        self.assertIn('Quelle: {}'.format(base_url), vevent['description'])
+
+    def test_date_range_year_rollover(self):
+        query = gremienkalender.date_range(months=12)
+        params = dict(pair.split('=') for pair in query.split('&'))
+        self.assertEqual(int(params['YYB']), int(params['YYV']) + 1)
+        self.assertEqual(params['MMB'], params['MMV'])
+        self.assertTrue(1 <= int(params['MMB']) <= 12)
+
 
 if __name__ == '__main__':
     unittest.main()